@@ -0,0 +1,231 @@
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from python_recipe_processor import jsonio
+from python_recipe_processor.main import pdf_to_images
+from python_recipe_processor.parsers.anthropic import AnthropicProvider, anthropic_client
+from python_recipe_processor.parsers.anthropic import _api_key as anthropic_api_key
+from python_recipe_processor.parsers.imageBase64Converter import images_to_base64
+from python_recipe_processor.parsers.openapi import OpenAIProvider, openai_client
+from python_recipe_processor.parsers.openapi import _api_key as openai_api_key
+from python_recipe_processor.parsers.pages import load_recipe_json
+
+# OpenAI batch states after which no more progress will be made
+_OPENAI_DONE = ("completed", "failed", "expired", "cancelled")
+
+# Per-batch input limits. OpenAI accepts 200 MB / 50,000 requests per input
+# file, uploaded straight from disk. Anthropic takes the requests in the request
+# body (up to 256 MB / 100,000), which the SDK builds in memory, so its batches
+# are kept much smaller.
+_BATCH_LIMITS = {
+    "openai": (190 * 1024 * 1024, 50000),
+    "anthropic": (64 * 1024 * 1024, 100000),
+}
+
+
+def _custom_ids(pdf_paths: List[Path]) -> Dict[str, Path]:
+    """Map each PDF to a unique batch custom_id derived from its file name."""
+    ids: Dict[str, Path] = {}
+    for path in pdf_paths:
+        # Anthropic only accepts [A-Za-z0-9_-]{1,64}
+        base = re.sub(r"[^A-Za-z0-9_-]", "_", path.stem)[:56] or "recipe"
+        custom_id, n = base, 1
+        while custom_id in ids:
+            n += 1
+            custom_id = f"{base}-{n}"
+        ids[custom_id] = path
+    return ids
+
+
+def _poll(check, describe: str) -> None:
+    """Call check() with exponential backoff until it returns True."""
+    delay = 5
+    while not check():
+        print(f"Batch {describe} still running, checking again in {delay}s...", file=sys.stderr)
+        time.sleep(delay)
+        delay = min(delay * 2, 300)
+
+
+def _client(provider: str) -> Any:
+    if provider == "anthropic":
+        return anthropic_client(anthropic_api_key())
+    return openai_client(openai_api_key())
+
+
+def _batch_line(provider: str, custom_id: str, base64_images: List[str]) -> bytes:
+    """One JSONL line of batch input for a PDF."""
+    if provider == "anthropic":
+        entry = {"custom_id": custom_id, "params": AnthropicProvider().format_request(base64_images)}
+    else:
+        entry = {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": OpenAIProvider().format_request(base64_images)
+        }
+    return (jsonio.dumps(entry) + "\n").encode("utf-8")
+
+
+def _create_batch(client: Any, provider: str, input_path: Path) -> str:
+    """Submit the JSONL file at input_path as one batch and return its id."""
+    if provider == "anthropic":
+        with open(input_path, "rb") as f:
+            batch = client.messages.batches.create(requests=[jsonio.loads(line) for line in f])
+        return batch.id
+
+    with open(input_path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    return batch.id
+
+
+def submit_batch(pdf_dir: str, provider: str = "openai",
+                 max_workers: Optional[int] = None) -> Dict[str, Dict[str, Path]]:
+    """
+    Rasterize every PDF in pdf_dir and submit them as provider batches.
+
+    One request is built per PDF, with all of its pages as images, and
+    written to a JSONL file as soon as the PDF is encoded. When the input
+    reaches the provider's per-batch limit it is submitted and a new batch is
+    started, so at most one batch's input is held in memory (for Anthropic,
+    whose requests are uploaded in the request body) or one PDF's (for OpenAI).
+
+    Args:
+        pdf_dir: Directory containing the PDF recipes
+        provider: "openai" or "anthropic"
+        max_workers: Maximum number of processes used to render pages
+
+    Returns:
+        Mapping of each batch id to the PDF each of its custom_ids belongs to
+    """
+    if provider not in _BATCH_LIMITS:
+        raise ValueError(f"Batch processing is not supported for provider: {provider}")
+    client = _client(provider)
+    max_bytes, max_requests = _BATCH_LIMITS[provider]
+
+    pdf_paths = sorted(Path(pdf_dir).glob("*.pdf"))
+    if not pdf_paths:
+        raise ValueError(f"No PDF files found in {pdf_dir}")
+
+    batches: Dict[str, Dict[str, Path]] = {}
+    pending: Dict[str, Path] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = Path(tmp_dir) / "batch_input.jsonl"
+        f = open(input_path, "wb")
+        size = 0
+        try:
+            for custom_id, path in _custom_ids(pdf_paths).items():
+                print(f"Converting {path.name} to images...", file=sys.stderr)
+                base64_images = images_to_base64(pdf_to_images(str(path), max_workers))
+                if not base64_images:
+                    print(f"Skipping {path.name}: no pages could be extracted", file=sys.stderr)
+                    continue
+
+                line = _batch_line(provider, custom_id, base64_images)
+                if pending and (size + len(line) > max_bytes or len(pending) >= max_requests):
+                    f.close()
+                    batches[_create_batch(client, provider, input_path)] = pending
+                    f = open(input_path, "wb")
+                    size, pending = 0, {}
+
+                f.write(line)
+                size += len(line)
+                pending[custom_id] = path
+        finally:
+            f.close()
+
+        if pending:
+            batches[_create_batch(client, provider, input_path)] = pending
+
+    if not batches:
+        raise ValueError(f"No pages could be extracted from the PDFs in {pdf_dir}")
+    return batches
+
+
+def wait_for_batch(batch_id: str, provider: str = "openai") -> Dict[str, Any]:
+    """
+    Poll a submitted batch until it finishes and collect the parsed recipes.
+
+    A batch that ends without completing (expired, failed, cancelled) does not
+    raise: whatever results it produced are returned, and requests without a
+    result are simply missing from the mapping.
+
+    Returns:
+        Mapping of custom_id to the parsed recipe, or to {"error": ...} for
+        requests that failed
+    """
+    results: Dict[str, Any] = {}
+
+    client = _client(provider)
+
+    if provider == "anthropic":
+        _poll(lambda: client.messages.batches.retrieve(batch_id).processing_status == "ended", batch_id)
+
+        for entry in client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                results[entry.custom_id] = {"error": entry.result.type}
+                continue
+            try:
+                results[entry.custom_id] = load_recipe_json(entry.result.message.content[0].text)
+            except ValueError as e:
+                results[entry.custom_id] = {"error": f"Invalid JSON: {e}"}
+        return results
+
+    if provider == "openai":
+        _poll(lambda: client.batches.retrieve(batch_id).status in _OPENAI_DONE, batch_id)
+
+        batch = client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            print(f"Batch {batch_id} ended with status: {batch.status}", file=sys.stderr)
+
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = jsonio.loads(line)
+                response = entry.get("response") or {}
+                if entry.get("error") or response.get("status_code") != 200:
+                    results[entry["custom_id"]] = {"error": entry.get("error") or response.get("body")}
+                    continue
+                try:
+                    results[entry["custom_id"]] = load_recipe_json(
+                        response["body"]["choices"][0]["message"]["content"])
+                except ValueError as e:
+                    results[entry["custom_id"]] = {"error": f"Invalid JSON: {e}"}
+        return results
+
+    raise ValueError(f"Batch processing is not supported for provider: {provider}")
+
+
+def run_batch(pdf_dir: str, provider: str = "openai", max_workers: Optional[int] = None) -> None:
+    """
+    Submit every PDF in pdf_dir as batches, and write <name>.json next to each
+    PDF as soon as the batch it belongs to finishes.
+    """
+    batches = submit_batch(pdf_dir, provider=provider, max_workers=max_workers)
+    for batch_id in batches:
+        print(f"Submitted {provider} batch {batch_id}", file=sys.stderr)
+
+    written = failed = 0
+    for batch_id, pdf_paths in batches.items():
+        results = wait_for_batch(batch_id, provider=provider)
+        for custom_id, pdf_path in pdf_paths.items():
+            recipe_data = results.get(custom_id, {"error": f"no result from batch {batch_id}"})
+            if "error" in recipe_data and len(recipe_data) == 1:
+                failed += 1
+                print(f"{pdf_path.name}: failed ({recipe_data['error']})", file=sys.stderr)
+                continue
+            pdf_path.with_suffix(".json").write_text(jsonio.dumps(recipe_data, indent=True), encoding="utf-8")
+            written += 1
+
+    print(f"Wrote {written} recipe(s), {failed} failed", file=sys.stderr)
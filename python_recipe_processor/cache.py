@@ -0,0 +1,124 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from python_recipe_processor import jsonio
+
+
+def cache_enabled() -> bool:
+    """Caching is on unless RPR_NO_CACHE is set to a truthy value."""
+    return os.getenv('RPR_NO_CACHE', '').lower() not in ('1', 'true', 'yes')
+
+
+def cache_dir() -> Path:
+    """Cache location: RPR_CACHE_DIR, else $XDG_CACHE_HOME/rpr, else ~/.cache/rpr."""
+    if os.getenv('RPR_CACHE_DIR'):
+        return Path(os.environ['RPR_CACHE_DIR'])
+    base = os.getenv('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return Path(base) / 'rpr'
+
+
+def cache_max_bytes() -> int:
+    """Size cap for the cache directory: RPR_CACHE_MAX_MB, default 1024 MB."""
+    return int(float(os.getenv('RPR_CACHE_MAX_MB', '1024')) * 1024 * 1024)
+
+
+def cache_key(*parts: Union[str, bytes]) -> str:
+    """Build a SHA-256 content address from the given parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_bytes(key: str, suffix: str) -> Optional[bytes]:
+    """Return the cached bytes for key, or None on a miss (or when caching is off)."""
+    if not cache_enabled():
+        return None
+    path = cache_dir() / f"{key}{suffix}"
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        # Bump the mtime so prune_cache() evicts least recently used entries first
+        os.utime(path)
+    except OSError:
+        pass
+    return data
+
+
+def store_bytes(key: str, suffix: str, data: bytes) -> None:
+    """Write bytes to the cache; failures are ignored since the cache is best-effort."""
+    if not cache_enabled():
+        return
+    try:
+        directory = cache_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, directory / f"{key}{suffix}")
+    except OSError:
+        pass
+
+
+def prune_cache() -> None:
+    """
+    Delete the least recently used cache entries until the cache directory
+    is below cache_max_bytes(). Best-effort, like the rest of the cache.
+    """
+    if not cache_enabled():
+        return
+    try:
+        entries = []
+        total = 0
+        with os.scandir(cache_dir()) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+    except OSError:
+        return
+
+    limit = cache_max_bytes()
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def load_json(key: str) -> Optional[Any]:
+    """Return the cached JSON value for key, or None on a miss."""
+    data = load_bytes(key, '.json')
+    if data is None:
+        return None
+    try:
+        return jsonio.loads(data)
+    except ValueError:
+        return None
+
+
+def store_json(key: str, value: Any) -> None:
+    """Cache a JSON-serialisable value under key."""
+    store_bytes(key, '.json', jsonio.dumps(value).encode('utf-8'))
@@ -0,0 +1,27 @@
+import json
+from typing import Any, Union
+
+# orjson is a much faster drop-in for the stdlib module (optional "fast" extra)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text; raises ValueError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialise to JSON, keeping non-ASCII characters as-is (two-space indent if requested)."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(value, option=option).decode('utf-8')
+    return json.dumps(value, indent=2 if indent else None, ensure_ascii=False, sort_keys=sort_keys)
@@ -1,10 +1,18 @@
-import json
+import ctypes
+import importlib
+import importlib.util
+import math
+import os
+import statistics
 import sys
-from typing import List
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import List, Optional, Tuple
 
-from python_recipe_processor.parsers.anthropic import parse_recipe_with_vision_anthropic
-from python_recipe_processor.parsers.ollama import parse_recipe_with_vision_ollama
-from python_recipe_processor.parsers.openapi import parse_recipe_with_vision_openai
+from python_recipe_processor import jsonio
+from python_recipe_processor.cache import (cache_enabled, cache_key, file_digest, load_bytes, prune_cache,
+                                           store_bytes)
 
 # Load environment variables from .env file
 try:
@@ -15,67 +23,241 @@ except ImportError:
     print("Warning: python-dotenv not installed. Make sure environment variables are set manually.", file=sys.stderr)
 
 try:
-    import pdfplumber
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
     from PIL import Image
 except ImportError:
     print("Please install required packages:")
-    print("  pip: poetry add pdfplumber pillow")
+    print("  pip: poetry add pypdfium2 pillow")
     sys.exit(1)
 
+# Parser module and function per provider. Only the selected provider's module is
+# imported, so unused providers (and their SDKs) cost nothing at startup.
+VISION_PARSERS = {
+    "openai": ("python_recipe_processor.parsers.openapi", "parse_recipe_with_vision_openai"),
+    "anthropic": ("python_recipe_processor.parsers.anthropic", "parse_recipe_with_vision_anthropic"),
+    "ollama": ("python_recipe_processor.parsers.ollama", "parse_recipe_with_vision_ollama"),
+}
 
-def main():
-    def pdf_to_images(pdf_path: str) -> List[Image.Image]:
-        """Convert PDF pages to PIL Images."""
-        images = []
+
+def _render_page(pdf_path: str, page_index: int, resolution: int, key: str) -> Tuple[str, Tuple[int, int], bytes]:
+    """
+    Render a single PDF page with pdfium (runs in a worker process).
+
+    Returns the raw pixel data rather than an encoded image so no PNG
+    round-trip is needed; the PNG is only produced for the disk cache, with
+    the fastest zlib level since cache writes happen for every fresh page.
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        img = pdf[page_index].render(scale=resolution / 72).to_pil()
+    finally:
+        pdf.close()
+
+    if cache_enabled():
+        buffered = BytesIO()
+        img.save(buffered, format="PNG", compress_level=1)
+        store_bytes(key, ".png", buffered.getvalue())
+
+    return img.mode, img.size, img.tobytes()
+
+
+def _adaptive_resolution(pdf: "pdfium.PdfDocument") -> int:
+    """
+    Pick a render DPI from the PDF's median font size so body text comes out
+    about 20 px tall: small print gets more pixels, large print fewer.
+
+    Scanned PDFs have no text layer and fall back to 150 DPI. Either way the
+    DPI is capped so the largest page's long edge renders no bigger than
+    RPR_IMAGE_MAX_EDGE (1568 px by default), since prepare_image() would only
+    downscale anything larger before upload; very large pages can therefore
+    go below 100 DPI.
+    """
+    sizes = []
+    long_edge = 0.0
+    matrix = pdfium_c.FS_MATRIX()
+    for page in pdf:
+        long_edge = max(long_edge, *page.get_size())
+        textpage = page.get_textpage()
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    # Convert page to image
-                    img = page.to_image(resolution=150)
-                    images.append(img.original)
-        except Exception as e:
-            raise Exception(f"Error converting PDF to images: {str(e)}")
-        return images
-
-    def pdf_recipe_to_json(pdf_path: str, provider: str = "openai") -> str:
+            # A sample of each page is plenty to find the body text size
+            for i in range(min(textpage.count_chars(), 2000)):
+                size = pdfium_c.FPDFText_GetFontSize(textpage.raw, i)
+                # The Tf size ignores scaling from the text and transformation matrices
+                # (cairo, for one, writes "1 Tf" and sets the real size through Tm)
+                if pdfium_c.FPDFText_GetMatrix(textpage.raw, i, ctypes.byref(matrix)):
+                    size *= math.sqrt(abs(matrix.a * matrix.d - matrix.b * matrix.c))
+                if size > 0:
+                    sizes.append(size)
+        finally:
+            textpage.close()
+            page.close()
+
+    resolution = min(max(20 * 72 / statistics.median(sizes), 100), 250) if sizes else 150
+    if long_edge > 0:
+        max_edge = int(os.getenv('RPR_IMAGE_MAX_EDGE', '1568'))
+        resolution = min(resolution, max_edge * 72 / long_edge)
+    return max(int(resolution), 1)
+
+
+def pdf_to_images(pdf_path: str, max_workers: Optional[int] = None,
+                  resolution: Optional[int] = None) -> List[Image.Image]:
+    """
+    Convert PDF pages to PIL Images, rendering pages in parallel processes.
+
+    Rendered pages are cached on disk keyed by the PDF contents, page index
+    and resolution, so repeated runs on the same PDF skip rendering. The
+    cache is pruned back to RPR_CACHE_MAX_MB after new pages are stored.
+
+    Args:
+        pdf_path: Path to the PDF file
+        max_workers: Upper bound on worker processes (defaults to CPU count)
+        resolution: Render resolution in DPI (defaults to RPR_DPI, else chosen
+            from the PDF's font size)
+
+    Returns:
+        List of page images in page order
+    """
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            n_pages = len(pdf)
+            if n_pages == 0:
+                return []
+            if resolution is None and os.getenv('RPR_DPI'):
+                resolution = int(os.environ['RPR_DPI'])
+            if resolution is None:
+                resolution = _adaptive_resolution(pdf)
+        finally:
+            pdf.close()
+
+        pdf_hash = file_digest(pdf_path)
+        keys = [cache_key(pdf_hash, str(i), str(resolution)) for i in range(n_pages)]
+        images: List[Optional[Image.Image]] = []
+        for key in keys:
+            cached = load_bytes(key, ".png")
+            images.append(Image.open(BytesIO(cached)) if cached is not None else None)
+        missing = [i for i, img in enumerate(images) if img is None]
+
+        workers = min(max_workers or os.cpu_count() or 1, max(len(missing), 1))
+        args = ([pdf_path] * len(missing), missing, [resolution] * len(missing), [keys[i] for i in missing])
+        if workers == 1:
+            rendered = list(map(_render_page, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rendered = list(pool.map(_render_page, *args))
+
+        for i, (mode, size, data) in zip(missing, rendered):
+            images[i] = Image.frombytes(mode, size, data)
+        if missing:
+            prune_cache()
+    except Exception as e:
+        raise Exception(f"Error converting PDF to images: {str(e)}")
+    return images
+
+
+def pdf_to_text(pdf_path: str) -> str:
+    """Extract the embedded text layer of a PDF (empty for scanned PDFs)."""
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            texts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                try:
+                    texts.append(textpage.get_text_range())
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+        return "\n\n".join(texts).strip()
+    except Exception as e:
+        raise Exception(f"Error extracting text from PDF: {str(e)}")
+
+
+def main():
+    def pdf_recipe_to_json(pdf_path: str, provider: str = "openai", max_workers: Optional[int] = None,
+                           ndjson: bool = False) -> str:
         """
         Main function: Convert PDF recipe to JSON string using vision AI.
 
         Args:
             pdf_path: Path to the PDF file
             provider: AI provider to use ("openai" or "anthropic")
+            max_workers: Maximum number of processes used to render pages
+            ndjson: Print each ingredient to stdout as a JSON line as soon as it
+                is parsed; the returned recipe is then a single JSON line too
 
         Returns:
             JSON string containing the parsed recipe
         """
-        # Convert PDF to images
-        print(f"Converting PDF to images...", file=sys.stderr)
-        images = pdf_to_images(pdf_path)
+        # Pages stream concurrently (Ollama from worker threads), so keep lines whole
+        lock = threading.Lock()
 
-        if not images:
-            raise ValueError("No pages could be extracted from the PDF")
+        def print_ingredient(page: Optional[int], ingredient) -> None:
+            line = jsonio.dumps({"type": "ingredient", "page": page, "ingredient": ingredient})
+            with lock:
+                print(line, flush=True)
 
-        print(f"Extracted {len(images)} page(s)", file=sys.stderr)
+        on_ingredient = print_ingredient if ndjson else None
 
-        # Parse with vision AI
-        print(f"Parsing recipe with {provider} vision model...", file=sys.stderr)
-        if provider == "anthropic":
-            recipe_data = parse_recipe_with_vision_anthropic(images)
-        elif provider == "ollama":
-            recipe_data = parse_recipe_with_vision_ollama(images)
-        else:
-            recipe_data = parse_recipe_with_vision_openai(images)
+        recipe_data = None
+
+        # Born-digital PDFs already carry the recipe as text; skip the vision model if possible
+        if provider == "openai":
+            text = pdf_to_text(pdf_path)
+            if len(text) > int(os.getenv('RPR_TEXT_MIN_CHARS', '500')):
+                print("Parsing recipe from embedded PDF text...", file=sys.stderr)
+                from python_recipe_processor.parsers.openapi import (OpenAIProvider, _api_key,
+                                                                     parse_recipe_with_text_openai)
+
+                # Configuration errors would fail the vision fallback the same way, so report them once
+                if importlib.util.find_spec("openai") is None:
+                    raise Exception(OpenAIProvider.missing_library)
+                _api_key()
+                try:
+                    recipe_data = parse_recipe_with_text_openai(text)
+                except Exception as e:
+                    print(f"{e}; falling back to vision model", file=sys.stderr)
+                if recipe_data is not None and on_ingredient:
+                    for ingredient in recipe_data.get("ingredients") or []:
+                        on_ingredient(None, ingredient)
+
+        if recipe_data is None:
+            # Convert PDF to images
+            print(f"Converting PDF to images...", file=sys.stderr)
+            images = pdf_to_images(pdf_path, max_workers=max_workers)
+
+            if not images:
+                raise ValueError("No pages could be extracted from the PDF")
+
+            print(f"Extracted {len(images)} page(s)", file=sys.stderr)
+
+            # Parse with vision AI
+            print(f"Parsing recipe with {provider} vision model...", file=sys.stderr)
+            module_name, function_name = VISION_PARSERS.get(provider, VISION_PARSERS["openai"])
+            parse_recipe_with_vision = getattr(importlib.import_module(module_name), function_name)
+            recipe_data = parse_recipe_with_vision(images, on_ingredient)
 
         # Convert to JSON string
-        json_string = json.dumps(recipe_data, indent=2, ensure_ascii=False)
+        if ndjson:
+            return jsonio.dumps({"type": "recipe", "recipe": recipe_data})
+        json_string = jsonio.dumps(recipe_data, indent=True)
 
         return json_string
 
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <path_to_pdf_recipe> [--anthropic]")
+    batch_mode = len(sys.argv) > 1 and sys.argv[1] == "batch"
+
+    if len(sys.argv) < (3 if batch_mode else 2):
+        print("Usage: python main.py <path_to_pdf_recipe> [--anthropic|--ollama] [--workers N] [--ndjson]")
+        print("       python main.py batch <pdf_directory> [--anthropic] [--workers N]")
         print("\nExamples:")
         print("  python main.py recipe.pdf")
         print("  python main.py recipe.pdf --anthropic")
+        print("  python main.py recipe.pdf --workers 2")
+        print("  python main.py recipe.pdf --ndjson")
+        print("  python main.py batch cookbook/")
         print("\nRequired environment variables:")
         print("  OPENAI_API_KEY      (for OpenAI GPT-4 Vision)")
         print("  ANTHROPIC_API_KEY   (for Claude Vision)")
@@ -83,18 +265,49 @@ def main():
         print("  OPENAI_API_KEY=sk-...")
         sys.exit(1)
 
-    pdf_file = sys.argv[1]
+    if batch_mode:
+        pdf_file = sys.argv[2]
+        options = sys.argv[3:]
+    else:
+        pdf_file = sys.argv[1]
+        options = sys.argv[2:]
 
-    if len(sys.argv) > 2 and sys.argv[2] == "--anthropic":
+    if "--anthropic" in options:
         provider = "anthropic"
-    elif len(sys.argv) > 2 and sys.argv[2] == "--ollama":
+    elif "--ollama" in options:
         provider = "ollama"
     else:
         provider = "openai"
 
+    # Cap the number of page-rendering processes to keep memory in check
+    max_workers = None
+    if "--workers" in options:
+        try:
+            max_workers = int(options[options.index("--workers") + 1])
+        except (IndexError, ValueError):
+            max_workers = 0
+        if max_workers < 1:
+            print("Error: --workers expects a positive integer", file=sys.stderr)
+            sys.exit(1)
+
+    ndjson = "--ndjson" in options
+    if ndjson:
+        from python_recipe_processor.parsers import stream
+
+        if stream.ijson is None:
+            print("Error: --ndjson needs the ijson library. Install with: poetry install --extras stream",
+                  file=sys.stderr)
+            sys.exit(1)
+
     try:
-        result = pdf_recipe_to_json(pdf_file, provider=provider)
-        print(result)
+        if batch_mode:
+            from python_recipe_processor.batch import run_batch
+
+            run_batch(pdf_file, provider=provider, max_workers=max_workers)
+        else:
+            result = pdf_recipe_to_json(pdf_file, provider=provider, max_workers=max_workers,
+                                        ndjson=ndjson)
+            print(result)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -1,81 +1,90 @@
-import json
+import os
 import sys
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
 
-from python_recipe_processor.parsers.imageBase64Converter import image_to_base64
+from python_recipe_processor.parsers.base import VisionProvider
+from python_recipe_processor.parsers.imageBase64Converter import image_media_type
+from python_recipe_processor.parsers.pages import max_retries
+from python_recipe_processor.parsers.prompt import VISION_PROMPT
 
 try:
     from PIL import Image
 except ImportError:
     print("Please install required packages:")
-    print("  pip: poetry add pdfplumber pillow")
+    print("  pip: poetry add pillow")
     sys.exit(1)
 
 
-def parse_recipe_with_vision_anthropic(images: List[Image.Image]) -> Dict[str, Any]:
-    """
-    Use Anthropic's Claude Vision to parse recipe from images.
-    """
-    try:
-        from anthropic import Anthropic
-        import os
-
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
-            raise Exception(
-                "ANTHROPIC_API_KEY not found. Please set it in .env file or as an environment variable.")
-
-        client = Anthropic(api_key=api_key)
-
-        # Prepare image content
-        image_content = []
-        for img in images:
-            base64_image = image_to_base64(img)
-            image_content.append({
+def _api_key() -> str:
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not api_key:
+        raise Exception(
+            "ANTHROPIC_API_KEY not found. Please set it in .env file or as an environment variable.")
+    return api_key
+
+
+@lru_cache(maxsize=1)
+def anthropic_client(api_key: str):
+    """Return a shared Anthropic client so its connection pool is reused across calls."""
+    import httpx
+    from anthropic import Anthropic, DefaultHttpxClient
+
+    return Anthropic(api_key=api_key,
+                     max_retries=max_retries(),
+                     http_client=DefaultHttpxClient(limits=httpx.Limits(max_keepalive_connections=20)))
+
+
+class AnthropicProvider(VisionProvider):
+    """Anthropic's Claude Vision via the Messages API."""
+
+    name = "anthropic"
+    missing_library = "Anthropic library not installed. Install with: poetry add anthropic"
+
+    def open_client(self) -> Any:
+        from anthropic import AsyncAnthropic
+
+        # Async clients are bound to the run's event loop, so one is shared per run
+        return AsyncAnthropic(api_key=_api_key(), max_retries=max_retries())
+
+    def format_request(self, base64_images: List[str], prompt: str = VISION_PROMPT) -> Dict[str, Any]:
+        media_type = image_media_type()
+
+        image_content = [
+            {
                 "type": "image",
                 "source": {
                     "type": "base64",
-                    "media_type": "image/png",
+                    "media_type": media_type,
                     "data": base64_image
                 }
-            })
-
-        # Add text prompt
-        content = image_content + [{
-            "type": "text",
-            "text": """Analyze this recipe image and extract all information into a JSON object with these fields:
-- title: recipe name
-- servings: number of servings
-- prep_time: preparation time
-- cook_time: cooking time
-- total_time: total time (if specified)
-- ingredients: array of ingredient objects with 'amount', 'unit', 'item', and optional 'notes'
-- instructions: array of step-by-step instructions
-- tags: array of relevant tags
-- cuisine: type of cuisine (if identifiable)
-
-Return ONLY valid JSON, no other text."""
-        }]
-
-        response = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=2000,
-            messages=[
+            }
+            for base64_image in base64_images
+        ]
+
+        return {
+            "model": "claude-sonnet-4-5-20250929",
+            "max_tokens": 2000,
+            "messages": [
                 {
                     "role": "user",
-                    "content": content
+                    "content": image_content + [{"type": "text", "text": prompt}]
                 }
             ]
-        )
+        }
 
-        json_text = response.content[0].text
-        # Remove markdown code blocks if present
-        if json_text.startswith("```"):
-            json_text = json_text.split("```json")[1].split("```")[0].strip()
+    async def call(self, client: Any, request: Dict[str, Any], on_text: Callable[[str], None]) -> str:
+        parts = []
+        async with client.messages.stream(**request) as stream:
+            async for text in stream.text_stream:
+                on_text(text)
+                parts.append(text)
+        return "".join(parts)
 
-        return json.loads(json_text)
 
-    except ImportError:
-        raise Exception("Anthropic library not installed. Install with: poetry add anthropic")
-    except Exception as e:
-        raise Exception(f"Vision parsing failed: {e}")
+def parse_recipe_with_vision_anthropic(images: List[Image.Image],
+                                       on_ingredient: Optional[Callable[[int, Any], None]] = None) -> Dict[str, Any]:
+    """
+    Use Anthropic's Claude Vision to parse recipe from images.
+    """
+    return AnthropicProvider().parse(images, on_ingredient)
@@ -0,0 +1,98 @@
+import asyncio
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+from python_recipe_processor import jsonio
+from python_recipe_processor.cache import cache_key, load_json, store_json
+from python_recipe_processor.parsers.imageBase64Converter import images_to_base64
+from python_recipe_processor.parsers.pages import load_recipe_json, max_concurrency, merge_recipe_pages
+from python_recipe_processor.parsers.prompt import VISION_PROMPT
+from python_recipe_processor.parsers.stream import IngredientStream
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Please install required packages:")
+    sys.exit(1)
+
+
+class VisionProvider(ABC):
+    """
+    Base class for vision model providers.
+
+    parse() owns the shared pipeline: encode pages, check the response cache,
+    send one streamed request per page concurrently, strip fences, parse JSON
+    and merge the pages. Subclasses only describe how to talk to their API.
+    """
+
+    name = ""
+    missing_library = ""
+
+    @abstractmethod
+    def open_client(self) -> Any:
+        """Return an async context manager yielding the client passed to call()."""
+
+    @abstractmethod
+    def format_request(self, base64_images: List[str], prompt: str = VISION_PROMPT) -> Dict[str, Any]:
+        """Build the API request for a set of base64-encoded page images."""
+
+    @abstractmethod
+    async def call(self, client: Any, request: Dict[str, Any], on_text: Callable[[str], None]) -> str:
+        """Send a request, passing each streamed text fragment to on_text, and return the full response."""
+
+    def parse(self, images: List[Image.Image],
+              on_ingredient: Optional[Callable[[int, Any], None]] = None) -> Dict[str, Any]:
+        """
+        Parse a recipe from page images.
+
+        If on_ingredient is given it is called with (page, ingredient) as soon
+        as each ingredient has streamed in, before the page is complete.
+        """
+        try:
+            client_context = self.open_client()
+            base64_images = images_to_base64(images)
+
+            async def _parse_page_async(client: Any, page: int, base64_image: str,
+                                        semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+                request = self.format_request([base64_image])
+
+                key = cache_key(self.name, jsonio.dumps(request, sort_keys=True))
+                cached = load_json(key)
+                if cached is not None:
+                    if on_ingredient:
+                        for ingredient in cached.get("ingredients") or []:
+                            on_ingredient(page, ingredient)
+                    return cached
+
+                stream = IngredientStream(lambda ingredient: on_ingredient(page, ingredient)) if on_ingredient else None
+                received = []
+
+                def on_text(text: str) -> None:
+                    if not received:
+                        print(f"Page {page}: receiving response...", file=sys.stderr)
+                        received.append(True)
+                    if stream:
+                        stream.feed(text)
+
+                async with semaphore:
+                    json_text = await self.call(client, request, on_text)
+                if stream:
+                    stream.close()
+
+                recipe_data = load_recipe_json(json_text)
+                store_json(key, recipe_data)
+                return recipe_data
+
+            async def _parse_pages_async() -> List[Dict[str, Any]]:
+                semaphore = asyncio.Semaphore(max_concurrency())
+                async with client_context as client:
+                    return await asyncio.gather(*[_parse_page_async(client, page, base64_image, semaphore)
+                                                for page, base64_image in enumerate(base64_images, 1)])
+
+            return merge_recipe_pages(asyncio.run(_parse_pages_async()))
+
+        except ImportError:
+            raise Exception(self.missing_library)
+        except Exception as e:
+            raise Exception(f"Vision parsing failed: {e}")
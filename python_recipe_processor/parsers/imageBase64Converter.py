@@ -1,17 +1,88 @@
-import base64
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from typing import List, Optional
 try:
-    import pdfplumber
-    from PIL import Image
+    from PIL import Image, ImageChops
 except ImportError:
     print("Please install required packages:")
     sys.exit(1)
 
+# pybase64 is a SIMD-accelerated drop-in for the stdlib encoder (optional "fast" extra)
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+
+def _use_png() -> bool:
+    """PNG can be forced with RPR_IMG_FORMAT=png (useful for line-art recipes)."""
+    return os.getenv('RPR_IMG_FORMAT', 'jpeg').lower() == 'png'
+
+
+def image_media_type() -> str:
+    """Return the MIME type produced by image_to_base64."""
+    return "image/png" if _use_png() else "image/jpeg"
+
+
+def _is_colourful(image: Image.Image) -> bool:
+    """
+    True when an image has noticeable colour, e.g. a food photo.
+
+    Judged by the share of strongly saturated pixels on a small thumbnail, so
+    a uniform paper tint (cream or yellowed scans) doesn't count as colour.
+    Very dark pixels are ignored since their hue is mostly scanner noise.
+    """
+    sample = image.convert("RGB")
+    sample.thumbnail((256, 256))
+    _, saturation, value = sample.convert("HSV").split()
+    saturated = ImageChops.multiply(saturation.point(lambda s: 255 if s > 80 else 0),
+                                    value.point(lambda v: 255 if v > 64 else 0))
+    return saturated.histogram()[255] > 0.02 * sample.width * sample.height
+
+
+def prepare_image(image: Image.Image, max_edge: Optional[int] = None) -> Image.Image:
+    """
+    Downscale an image so its long edge fits within max_edge pixels, and
+    convert colourless scans to grayscale.
+
+    Vision APIs bill and parse by image tile, so oversized page renders only
+    add latency. Defaults to RPR_IMAGE_MAX_EDGE or 1568 px (Anthropic's
+    recommended maximum). Grayscale can be turned off with RPR_GRAYSCALE=0.
+    """
+    if max_edge is None:
+        max_edge = int(os.getenv('RPR_IMAGE_MAX_EDGE', '1568'))
+    if max(image.size) > max_edge:
+        image = image.copy()
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    if os.getenv('RPR_GRAYSCALE', '1') != '0' and image.mode != "L" and not _is_colourful(image):
+        image = image.convert("L")
+    return image
+
 
 def image_to_base64(image: Image.Image) -> str:
-    """Convert PIL Image to base64 string."""
+    """Convert PIL Image to base64 string (JPEG by default)."""
     buffered = BytesIO()
-    image.save(buffered, format="PNG")
-    img_bytes = buffered.getvalue()
-    return base64.b64encode(img_bytes).decode('utf-8')
\ No newline at end of file
+    if _use_png():
+        image.save(buffered, format="PNG")
+    else:
+        # JPEG has no alpha channel or palette
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(buffered, format="JPEG", quality=85, optimize=True)
+    # getbuffer() is a zero-copy view; base64 output is pure ASCII
+    return base64.b64encode(buffered.getbuffer()).decode('ascii')
+
+
+def images_to_base64(images: List[Image.Image]) -> List[str]:
+    """
+    Prepare and encode several page images at once.
+
+    PIL's resize/encode and the base64 encoder release the GIL, so pages are
+    encoded in parallel threads. Order is preserved.
+    """
+    if len(images) == 1:
+        return [image_to_base64(prepare_image(images[0]))]
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(lambda img: image_to_base64(prepare_image(img)), images))
@@ -1,8 +1,14 @@
-import json
+import asyncio
+import os
 import sys
-from typing import List, Dict, Any
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
 
-from python_recipe_processor.parsers.imageBase64Converter import image_to_base64
+from python_recipe_processor import jsonio
+from python_recipe_processor.parsers.base import VisionProvider
+from python_recipe_processor.parsers.pages import max_retries
+from python_recipe_processor.parsers.prompt import VISION_PROMPT
 
 try:
     from PIL import Image
@@ -11,67 +17,79 @@ except ImportError:
     sys.exit(1)
 
 
-def parse_recipe_with_vision_ollama(images: List[Image.Image]) -> Dict[str, Any]:
+@lru_cache(maxsize=1)
+def ollama_session():
+    """Return a shared requests session so connections to Ollama are kept alive."""
+    import requests
+    from urllib3.util.retry import Retry
+
+    # Retry dropped connections and transient server errors with exponential backoff
+    # (POST is not retried by default, so allow every method). A refused connection
+    # means Ollama is not running, so fail fast on those instead of backing off.
+    retry = Retry(total=max_retries(), connect=0, backoff_factor=1,
+                  status_forcelist=(429, 500, 502, 503, 504), allowed_methods=None, raise_on_status=False)
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=20, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class OllamaProvider(VisionProvider):
+    """A local Ollama vision model via the generate API."""
+
+    name = "ollama"
+    missing_library = "requests library not installed. Install with: poetry add requests"
+
+    def __init__(self):
+        # Get Ollama base URL (default to localhost)
+        self.ollama_url = os.getenv('OLLAMA_URL', 'http://localhost:11434')
+        self.model = os.getenv('OLLAMA_MODEL', 'llama3.2-vision')
+
+    def open_client(self) -> Any:
+        return nullcontext(ollama_session())
+
+    def format_request(self, base64_images: List[str], prompt: str = VISION_PROMPT) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "images": base64_images,
+            "stream": True,
+            "format": "json"
+        }
+
+    def _generate(self, session: Any, request: Dict[str, Any], on_text: Callable[[str], None]) -> str:
+        import requests
+
+        try:
+            # Ollama streams newline-delimited JSON objects, each carrying a fragment of the response
+            with session.post(f"{self.ollama_url}/api/generate", json=request, timeout=600, stream=True) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+
+                parts = []
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = jsonio.loads(line)
+                    if chunk.get('error'):
+                        raise Exception(f"Ollama API error: {chunk['error']}")
+                    if chunk.get('response'):
+                        on_text(chunk['response'])
+                        parts.append(chunk['response'])
+                return "".join(parts)
+        except requests.exceptions.ConnectionError:
+            raise Exception(f"Could not connect to Ollama at {self.ollama_url}. Make sure Ollama is running.")
+
+    async def call(self, client: Any, request: Dict[str, Any], on_text: Callable[[str], None]) -> str:
+        # requests is blocking, so run it in a thread
+        return await asyncio.to_thread(self._generate, client, request, on_text)
+
+
+def parse_recipe_with_vision_ollama(images: List[Image.Image],
+                                    on_ingredient: Optional[Callable[[int, Any], None]] = None) -> Dict[str, Any]:
     """
     Use Ollama's vision model to parse recipe from images.
     """
-    try:
-        import requests
-        import os
-
-        # Get Ollama base URL (default to localhost)
-        ollama_url = os.getenv('OLLAMA_URL', 'http://localhost:11434')
-        model = os.getenv('OLLAMA_MODEL', 'llama3.2-vision')
-
-        # Prepare image content
-        image_data = []
-        for img in images:
-            base64_image = image_to_base64(img)
-            image_data.append(base64_image)
-
-        # Create the prompt
-        prompt = """Analyze this recipe image and extract all information into a JSON object with these fields:
-- title: recipe name
-- servings: number of servings
-- prep_time: preparation time
-- cook_time: cooking time
-- total_time: total time (if specified)
-- ingredients: array of ingredient objects with 'amount', 'unit', 'item', and optional 'notes'
-- instructions: array of step-by-step instructions
-- tags: array of relevant tags
-- cuisine: type of cuisine (if identifiable)
-- difficulty: difficulty level (if specified)
-
-Return ONLY valid JSON, no other text."""
-
-        # Make request to Ollama API
-        response = requests.post(
-            f"{ollama_url}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "images": image_data,
-                "stream": False,
-                "format": "json"
-            },
-            timeout=600
-        )
-
-        if response.status_code != 200:
-            raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
-
-        result = response.json()
-        json_text = result.get('response', '')
-
-        # Remove markdown code blocks if present
-        if json_text.startswith("```"):
-            json_text = json_text.split("```json")[1].split("```")[0].strip()
-
-        return json.loads(json_text)
-
-    except ImportError:
-        raise Exception("requests library not installed. Install with: poetry add requests")
-    except requests.exceptions.ConnectionError:
-        raise Exception(f"Could not connect to Ollama at {ollama_url}. Make sure Ollama is running.")
-    except Exception as e:
-        raise Exception(f"Vision parsing failed: {e}")
+    return OllamaProvider().parse(images, on_ingredient)
@@ -1,8 +1,13 @@
-import json
+import os
 import sys
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
 
-from python_recipe_processor.parsers.imageBase64Converter import image_to_base64
+from python_recipe_processor.cache import cache_key, load_json, store_json
+from python_recipe_processor.parsers.base import VisionProvider
+from python_recipe_processor.parsers.imageBase64Converter import image_media_type
+from python_recipe_processor.parsers.pages import load_recipe_json, max_retries
+from python_recipe_processor.parsers.prompt import TEXT_PROMPT, VISION_PROMPT
 
 try:
     from PIL import Image
@@ -11,73 +16,116 @@ except ImportError:
     sys.exit(1)
 
 
-def parse_recipe_with_vision_openai(images: List[Image.Image]) -> Dict[str, Any]:
-    """
-    Use OpenAI's vision model (GPT-4 Vision) to parse recipe from images.
-    """
-    try:
-        from openai import OpenAI
-        import os
+def _api_key() -> str:
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise Exception("OPENAI_API_KEY not found. Please set it in .env file or as an environment variable.")
+    return api_key
+
+
+@lru_cache(maxsize=1)
+def openai_client(api_key: str):
+    """Return a shared OpenAI client so its connection pool is reused across calls."""
+    import httpx
+    from openai import DefaultHttpxClient, OpenAI
+
+    return OpenAI(api_key=api_key,
+                  max_retries=max_retries(),
+                  http_client=DefaultHttpxClient(limits=httpx.Limits(max_keepalive_connections=20)))
+
 
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise Exception("OPENAI_API_KEY not found. Please set it in .env file or as an environment variable.")
+class OpenAIProvider(VisionProvider):
+    """OpenAI's vision model (GPT-4 Vision) via the chat completions API."""
 
-        client = OpenAI(api_key=api_key)
+    name = "openai"
+    missing_library = "OpenAI library not installed. Install with: poetry add openai"
 
-        # Prepare image messages
-        image_content = []
-        for idx, img in enumerate(images):
-            base64_image = image_to_base64(img)
-            image_content.append({
+    def open_client(self) -> Any:
+        from openai import AsyncOpenAI
+
+        # Async clients are bound to the run's event loop, so one is shared per run
+        return AsyncOpenAI(api_key=_api_key(), max_retries=max_retries())
+
+    def format_request(self, base64_images: List[str], prompt: str = VISION_PROMPT) -> Dict[str, Any]:
+        media_type = image_media_type()
+        # "high" for small print; "low" is a flat 85 tokens per image
+        detail = os.getenv('RPR_IMAGE_DETAIL', 'high')
+
+        image_content = [
+            {
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/png;base64,{base64_image}",
-                    "detail": "high"  # Use "high" for better detail recognition
+                    "url": f"data:{media_type};base64,{base64_image}",
+                    "detail": detail
+                }
+            }
+            for base64_image in base64_images
+        ]
+
+        return {
+            "model": "gpt-4o",  # gpt-4o or gpt-4-turbo support vision
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [{"type": "text", "text": prompt}] + image_content
                 }
-            })
-
-        # Create the prompt
-        prompt = {
-            "type": "text",
-            "text": """Analyze this recipe image and extract all information into a JSON object with these fields:
-   - title: recipe name
-   - servings: number of servings
-   - prep_time: preparation time
-   - cook_time: cooking time
-   - total_time: total time (if specified)
-   - ingredients: array of ingredient objects with 'amount', 'unit', 'item', and optional 'notes'
-   - instructions: array of step-by-step instructions (numbered if possible)
-   - tags: array of relevant tags (e.g., "vegetarian", "dessert", "quick", "easy")
-   - cuisine: type of cuisine (if identifiable)
-   - difficulty: difficulty level (if specified)
-
-   Return ONLY valid JSON, no other text."""
+            ],
+            "max_tokens": 2000,
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"}
         }
 
-        # Combine prompt and images
-        messages_content = [prompt] + image_content
+    async def call(self, client: Any, request: Dict[str, Any], on_text: Callable[[str], None]) -> str:
+        parts = []
+        stream = await client.chat.completions.create(**request, stream=True)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                on_text(chunk.choices[0].delta.content)
+                parts.append(chunk.choices[0].delta.content)
+        return "".join(parts)
+
+
+def parse_recipe_with_vision_openai(images: List[Image.Image],
+                                    on_ingredient: Optional[Callable[[int, Any], None]] = None) -> Dict[str, Any]:
+    """
+    Use OpenAI's vision model (GPT-4 Vision) to parse recipe from images.
+    """
+    return OpenAIProvider().parse(images, on_ingredient)
+
 
-        response = client.chat.completions.create(
-            model="gpt-4o",  # gpt-4o or gpt-4-turbo support vision
+def parse_recipe_with_text_openai(text: str) -> Dict[str, Any]:
+    """
+    Use a text-only OpenAI model to parse a recipe from text extracted from the PDF.
+
+    Much cheaper and faster than the vision model for born-digital PDFs.
+    """
+    try:
+        api_key = _api_key()
+        model = "gpt-4o-mini"
+
+        key = cache_key("openai", model, TEXT_PROMPT, text)
+        cached = load_json(key)
+        if cached is not None:
+            return cached
+
+        response = openai_client(api_key).chat.completions.create(
+            model=model,
             messages=[
                 {
                     "role": "user",
-                    "content": messages_content
+                    "content": TEXT_PROMPT + text
                 }
             ],
             max_tokens=2000,
-            temperature=0.3
+            temperature=0.3,
+            response_format={"type": "json_object"}
         )
 
-        json_text = response.choices[0].message.content
-        # Remove markdown code blocks if present
-        if json_text.startswith("```"):
-            json_text = json_text.split("```json")[1].split("```")[0].strip()
-
-        return json.loads(json_text)
+        recipe_data = load_recipe_json(response.choices[0].message.content)
+        store_json(key, recipe_data)
+        return recipe_data
 
     except ImportError:
-        raise Exception("OpenAI library not installed. Install with: poetry add openai")
+        raise Exception(OpenAIProvider.missing_library)
     except Exception as e:
-        raise Exception(f"Vision parsing failed: {e}")
+        raise Exception(f"Text parsing failed: {e}")
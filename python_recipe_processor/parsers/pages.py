@@ -0,0 +1,59 @@
+import os
+import re
+from typing import List, Dict, Any
+
+from python_recipe_processor import jsonio
+
+# A whole response wrapped in a markdown code block, with or without a language tag
+_FENCE_RE = re.compile(r"^```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL | re.IGNORECASE)
+
+
+def max_concurrency() -> int:
+    """Maximum number of page requests in flight at once (RPR_MAX_CONCURRENCY)."""
+    return max(1, int(os.getenv('RPR_MAX_CONCURRENCY', '5')))
+
+
+def max_retries() -> int:
+    """
+    Retries for transient API failures (RPR_MAX_RETRIES).
+
+    Rate limits, timeouts, connection errors and 5xx responses are retried
+    with exponential backoff so one hiccup doesn't fail the whole PDF.
+    """
+    return max(0, int(os.getenv('RPR_MAX_RETRIES', '5')))
+
+
+def load_recipe_json(json_text: str) -> Dict[str, Any]:
+    """Parse a model response as JSON, removing a surrounding markdown code block if present."""
+    json_text = json_text.strip()
+    match = _FENCE_RE.match(json_text)
+    if match:
+        json_text = match.group(1)
+    return jsonio.loads(json_text)
+
+
+def merge_recipe_pages(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-page recipe results into a single recipe.
+
+    Array fields (ingredients, instructions, tags, ...) are concatenated in
+    page order; scalar fields keep the first non-empty value. A null or empty
+    value from one page never hides another page's data.
+    """
+    if len(partials) == 1:
+        return partials[0]
+
+    merged: Dict[str, Any] = {}
+    for partial in partials:
+        for key, value in partial.items():
+            current = merged.get(key)
+            if isinstance(value, list):
+                if current in (None, ""):
+                    merged[key] = list(value)
+                elif isinstance(current, list):
+                    current.extend(value)
+            elif current in (None, "") and value not in (None, ""):
+                merged[key] = value
+            else:
+                merged.setdefault(key, value)
+    return merged
@@ -0,0 +1,25 @@
+RECIPE_FIELDS = """- title: recipe name
+- servings: number of servings
+- prep_time: preparation time
+- cook_time: cooking time
+- total_time: total time (if specified)
+- ingredients: array of ingredient objects with 'amount', 'unit', 'item', and optional 'notes'
+- instructions: array of step-by-step instructions (numbered if possible)
+- tags: array of relevant tags (e.g., "vegetarian", "dessert", "quick", "easy")
+- cuisine: type of cuisine (if identifiable)
+- difficulty: difficulty level (if specified)"""
+
+# Prompt sent alongside page images to every vision provider
+VISION_PROMPT = f"""Analyze this recipe image and extract all information into a JSON object with these fields:
+{RECIPE_FIELDS}
+
+Return ONLY valid JSON, no other text."""
+
+# Prompt for recipes parsed from a PDF's embedded text; the text is appended after it
+TEXT_PROMPT = f"""Analyze this recipe text and extract all information into a JSON object with these fields:
+{RECIPE_FIELDS}
+
+Return ONLY valid JSON, no other text.
+
+Recipe text:
+"""
@@ -0,0 +1,57 @@
+from typing import Any, Callable
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+class IngredientStream:
+    """
+    Incrementally parse a streamed JSON response, reporting each ingredient
+    as soon as its object is complete rather than after the whole response
+    has arrived.
+
+    Best-effort: if the streamed text is not clean JSON (e.g. it is wrapped in
+    prose), reporting stops and the caller's full parse still applies.
+    """
+
+    def __init__(self, on_ingredient: Callable[[Any], None]):
+        if ijson is None:
+            raise Exception("ijson library not installed. Install with: poetry install --extras stream")
+        self._on_ingredient = on_ingredient
+        self._items = ijson.sendable_list()
+        self._coro = ijson.items_coro(self._items, 'ingredients.item', use_float=True)
+        self._started = False
+        self._failed = False
+
+    def feed(self, text: str) -> None:
+        if self._failed:
+            return
+        if not self._started:
+            # Skip anything before the JSON object, such as an opening ``` fence
+            start = text.find('{')
+            if start < 0:
+                return
+            text = text[start:]
+            self._started = True
+        try:
+            self._coro.send(text.encode('utf-8'))
+        except ijson.JSONError:
+            # e.g. a closing ``` fence after the object; the full parse still applies
+            self._failed = True
+        self._flush()
+
+    def close(self) -> None:
+        if not self._failed:
+            try:
+                self._coro.close()
+            except ijson.JSONError:
+                # Trailing text such as a closing ``` fence; everything useful has been reported
+                pass
+        self._flush()
+
+    def _flush(self) -> None:
+        for item in self._items:
+            self._on_ingredient(item)
+        del self._items[:]
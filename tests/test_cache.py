@@ -0,0 +1,28 @@
+import os
+
+from python_recipe_processor import cache
+
+
+def test_prune_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv('RPR_CACHE_DIR', str(tmp_path))
+    monkeypatch.setenv('RPR_CACHE_MAX_MB', str(2.5 / 1024))  # 2.5 KB
+    monkeypatch.delenv('RPR_NO_CACHE', raising=False)
+
+    for i, key in enumerate(["old", "used", "new"]):
+        cache.store_bytes(key, ".png", b"x" * 1024)
+        os.utime(tmp_path / f"{key}.png", (1000 + i, 1000 + i))
+    assert cache.load_bytes("used", ".png") is not None  # now the most recently used
+
+    cache.prune_cache()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new.png", "used.png"]
+
+
+def test_prune_cache_keeps_cache_under_limit(tmp_path, monkeypatch):
+    monkeypatch.setenv('RPR_CACHE_DIR', str(tmp_path))
+    monkeypatch.delenv('RPR_NO_CACHE', raising=False)
+
+    cache.store_json("recipe", {"title": "Soup"})
+    cache.prune_cache()
+
+    assert cache.load_json("recipe") == {"title": "Soup"}
@@ -0,0 +1,42 @@
+import random
+
+from PIL import Image, ImageDraw
+
+from python_recipe_processor.parsers.imageBase64Converter import prepare_image
+
+
+def _text_page(paper):
+    page = Image.new("RGB", (850, 1100), paper)
+    draw = ImageDraw.Draw(page)
+    for y in range(80, 1000, 30):
+        draw.text((60, y), "2 cups flour, 1 tsp salt, 3 eggs, 250 ml milk", fill=(20, 20, 20))
+    return page
+
+
+def _add_photo(page):
+    rng = random.Random(0)
+    photo = Image.new("RGB", (400, 300))
+    photo.putdata([(rng.randint(150, 255), rng.randint(40, 140), rng.randint(0, 60))
+                   for _ in range(400 * 300)])
+    page.paste(photo, (225, 100))
+    return page
+
+
+def test_white_text_page_becomes_grayscale(monkeypatch):
+    monkeypatch.delenv('RPR_GRAYSCALE', raising=False)
+    assert prepare_image(_text_page((255, 255, 255))).mode == "L"
+
+
+def test_tinted_paper_text_page_becomes_grayscale(monkeypatch):
+    monkeypatch.delenv('RPR_GRAYSCALE', raising=False)
+    assert prepare_image(_text_page((245, 236, 215))).mode == "L"
+
+
+def test_page_with_photo_stays_colour(monkeypatch):
+    monkeypatch.delenv('RPR_GRAYSCALE', raising=False)
+    assert prepare_image(_add_photo(_text_page((245, 236, 215)))).mode == "RGB"
+
+
+def test_grayscale_can_be_disabled(monkeypatch):
+    monkeypatch.setenv('RPR_GRAYSCALE', '0')
+    assert prepare_image(_text_page((245, 236, 215))).mode == "RGB"
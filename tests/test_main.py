@@ -0,0 +1,67 @@
+import pypdfium2 as pdfium
+import pytest
+
+from python_recipe_processor.main import _adaptive_resolution
+
+
+def _make_pdf(content: bytes, width: int = 612, height: int = 792) -> bytes:
+    """A one-page PDF drawing content with Helvetica as /F1."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>" % (width, height),
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+def _resolution(content: bytes, **page_size) -> int:
+    pdf = pdfium.PdfDocument(_make_pdf(content, **page_size))
+    try:
+        return _adaptive_resolution(pdf)
+    finally:
+        pdf.close()
+
+
+@pytest.fixture(autouse=True)
+def _uncapped(monkeypatch):
+    # Letter pages are otherwise capped at 142 DPI by the default 1568 px edge
+    monkeypatch.setenv('RPR_IMAGE_MAX_EDGE', '100000')
+
+
+@pytest.mark.parametrize("content", [
+    b"BT /F1 24 Tf 72 700 Td (Large print recipe) Tj ET",
+    b"BT /F1 1 Tf 24 0 0 24 72 700 Tm (Large print recipe) Tj ET",
+    b"q 2 0 0 2 0 0 cm BT /F1 12 Tf 36 350 Td (Large print recipe) Tj ET Q",
+])
+def test_large_print_gets_low_dpi_however_it_is_sized(content):
+    assert _resolution(content) == 100
+
+
+def test_small_print_gets_more_dpi():
+    # 8 pt text: 20 px tall at 180 DPI
+    assert _resolution(b"BT /F1 1 Tf 8 0 0 8 72 700 Tm (Small print recipe) Tj ET") == 180
+
+
+def test_scanned_pdf_falls_back_to_150_dpi():
+    assert _resolution(b"0 0 m 100 100 l S") == 150
+
+
+def test_dpi_is_capped_by_max_image_edge(monkeypatch):
+    monkeypatch.delenv('RPR_IMAGE_MAX_EDGE')
+    small_print = b"BT /F1 8 Tf 72 700 Td (Small print recipe) Tj ET"
+    # Letter (792 pt tall): 180 DPI would be 1980 px, 142 DPI fits in 1568 px
+    assert _resolution(small_print) == 142
+    # A3 (1191 pt tall) is capped below the usual 100 DPI floor
+    assert _resolution(small_print, width=842, height=1191) == 94
@@ -0,0 +1,60 @@
+import pytest
+
+from python_recipe_processor.parsers.pages import load_recipe_json, merge_recipe_pages
+
+
+def test_single_page_is_returned_unchanged():
+    page = {"title": "Bread", "ingredients": [{"item": "flour"}]}
+    assert merge_recipe_pages([page]) is page
+
+
+def test_null_then_list_keeps_later_items():
+    merged = merge_recipe_pages([
+        {"title": "Bread", "ingredients": None, "instructions": ["Mix"]},
+        {"title": None, "ingredients": [{"item": "flour"}], "instructions": ["Bake"]},
+    ])
+    assert merged == {
+        "title": "Bread",
+        "ingredients": [{"item": "flour"}],
+        "instructions": ["Mix", "Bake"],
+    }
+
+
+def test_list_then_null_keeps_earlier_items():
+    merged = merge_recipe_pages([
+        {"ingredients": [{"item": "flour"}], "servings": ""},
+        {"ingredients": None, "servings": 4},
+    ])
+    assert merged == {"ingredients": [{"item": "flour"}], "servings": 4}
+
+
+def test_repeated_items_across_pages_are_kept():
+    salt = {"amount": "1", "unit": "tsp", "item": "salt"}
+    merged = merge_recipe_pages([
+        {"ingredients": [salt, {"item": "flour"}]},
+        {"ingredients": [salt, {"item": "butter"}]},
+    ])
+    assert merged["ingredients"] == [salt, {"item": "flour"}, salt, {"item": "butter"}]
+
+
+def test_partials_are_not_mutated():
+    first = {"tags": ["bread"]}
+    merge_recipe_pages([first, {"tags": ["baking"]}])
+    assert first == {"tags": ["bread"]}
+
+
+@pytest.mark.parametrize("text", [
+    '{"title": "Bread"}',
+    '```json\n{"title": "Bread"}\n```',
+    '```JSON\n{"title": "Bread"}\n```',
+    '```\n{"title": "Bread"}\n```',
+    '```{"title": "Bread"}```',
+    '  \n```json  \n  {"title": "Bread"}  \n```  \n',
+])
+def test_load_recipe_json_strips_fences(text):
+    assert load_recipe_json(text) == {"title": "Bread"}
+
+
+def test_load_recipe_json_rejects_invalid_json():
+    with pytest.raises(ValueError):
+        load_recipe_json("```json\nnot json\n```")
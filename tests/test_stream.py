@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("ijson")
+
+from python_recipe_processor.parsers.stream import IngredientStream  # noqa: E402
+
+INGREDIENTS = [
+    {"amount": "2", "unit": "cups", "item": "flour"},
+    {"amount": "1.5", "unit": "tsp", "item": "salt"},
+    {"amount": 3, "unit": None, "item": "crème fraîche"},
+]
+RESPONSE = ('{"title": "Bread", "ingredients": ['
+            '{"amount": "2", "unit": "cups", "item": "flour"}, '
+            '{"amount": "1.5", "unit": "tsp", "item": "salt"}, '
+            '{"amount": 3, "unit": null, "item": "crème fraîche"}], '
+            '"instructions": ["Mix", "Bake"]}')
+
+
+def _stream(chunks):
+    reported = []
+    stream = IngredientStream(reported.append)
+    for chunk in chunks:
+        stream.feed(chunk)
+    stream.close()
+    return reported
+
+
+def _split(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 10000])
+def test_reports_each_ingredient_once(size):
+    assert _stream(_split(RESPONSE, size)) == INGREDIENTS
+
+
+@pytest.mark.parametrize("size", [1, 5, 64])
+def test_skips_leading_fence(size):
+    assert _stream(_split("```json\n" + RESPONSE, size)) == INGREDIENTS
+
+
+@pytest.mark.parametrize("size", [1, 5, 64, 10000])
+def test_tolerates_trailing_fence(size):
+    assert _stream(_split("```json\n" + RESPONSE + "\n```", size)) == INGREDIENTS
+
+
+def test_ingredients_are_reported_before_the_response_ends():
+    reported = []
+    stream = IngredientStream(reported.append)
+    stream.feed(RESPONSE[:RESPONSE.index('{"amount": "1.5"')])
+    assert reported == INGREDIENTS[:1]